@@ -7,3 +7,21 @@ COLLECTION_NAME = "MovieScraper"
 BASE_URL = "https://myflixerz.to/movie?page="  # Base URL
 KEYWORDS = ["https://myflixerz.to/movie/"]    # Movie URL keywords
 NUM_PAGES = 10  # Number of pages to scrape
+
+# Deadline mode (main_playwright.py --deadline / RUN_DEADLINE)
+# Relative share of the time budget per phase; unused time rolls forward.
+TIME_BUDGET_SHARES = {
+    "new": 0.65,      # Scrape never-seen URLs
+    "retry": 0.10,    # Retry URLs that failed this run
+    "ingest": 0.25,   # Left for ingest.py
+}
+
+# Page snapshot cache (scrape --snapshots, re-extract)
+SNAPSHOT_DIR = "snapshots"
+SNAPSHOT_MAX_MB = 2048  # Oldest snapshots are evicted beyond this
+
+# Profiling (--profile MODES / SCRAPER_PROFILE, see scraper/profiling.py)
+PROFILE_DIR = "profiles"
+PROFILE_SAMPLE_EVERY = 5     # cProfile / stack-sample every Nth batch
+PROFILE_SLOWEST_PAGES = 10   # Keep Playwright traces for this many slowest pages
+SLOW_CALLBACK_SECONDS = 0.1  # Loop stalls (and, in asyncio debug mode, callbacks) longer than this are counted
@@ -1,10 +1,17 @@
 """
 Phase 2: Ingest scraped movies from scraped_movies.json into RecoMo API.
-Resumable — already-ingested URLs are pre-filtered locally (fast).
+Resumable — already-ingested URLs are pre-filtered locally (fast) against
+a replica in ingested_urls.json, synced incrementally in the background.
 
-Usage: python ingest.py
-       python ingest.py --limit 5000
-       python ingest.py --api http://localhost:8000
+Usage: python movie_scraper.py ingest
+       python movie_scraper.py ingest --limit 5000
+       python movie_scraper.py ingest --api http://localhost:8000
+       python movie_scraper.py ingest --deadline 45
+       python movie_scraper.py ingest --profile cprofile,memory
+       (or python ingest.py [options])
+
+With a deadline (--deadline MINUTES or RUN_DEADLINE=<unix timestamp>),
+ingest stops cleanly when time runs out; the rest goes in on the next run.
 
 Requires: RecoMo backend running (uvicorn app.main:app --reload)
 """
@@ -15,32 +22,27 @@ import os
 import sys
 import time
 
-import requests
-
+from scraper.profiling import SCRAPE_ONLY_MODES, Profiler, parse_profile_modes
+from scraper.run_planner import resolve_deadline
 from storage.data_store import DataStore
+from storage.url_replica import REPLICA_FILE, IngestedUrlReplica
 
 SCRAPED_FILE = "scraped_movies.json"
 
-
-def fetch_existing_urls(api_url):
-    """Fetch all URLs already in the DB — one fast query to avoid slow per-movie skips."""
-    print(f"Fetching already-ingested URLs from DB ({api_url})...")
-    try:
-        resp = requests.get(f"{api_url}/api/movies/urls", timeout=(10, 30))
-        resp.raise_for_status()
-        urls = set(resp.json())
-        print(f"  {len(urls)} movies already in DB — skipping them.\n")
-        return urls
-    except Exception as e:
-        print(f"  Warning: could not fetch existing URLs ({e}). Proceeding without pre-filter.\n")
-        return set()
+# Ingest replies meaning the movie is already in the DB (not a failure). The
+# pre-filter can miss these while the background replica sync is catching up.
+ALREADY_IN_DB_STATUSES = {"skipped", "exists", "already_exists", "duplicate"}
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Ingest scraped movies to RecoMo API")
+def add_arguments(parser):
     parser.add_argument("--api", default=os.environ.get("RECOMO_API_URL", "http://localhost:8000"), help="RecoMo API URL")
     parser.add_argument("--limit", type=int, default=None, help="Max number of NEW movies to ingest (default: all)")
-    args = parser.parse_args()
+    parser.add_argument("--deadline", type=float, default=None, help="Time budget in minutes (default: RUN_DEADLINE env timestamp, else unlimited)")
+    parser.add_argument("--profile", type=parse_profile_modes, default=os.environ.get("SCRAPER_PROFILE", ""), help="Profiling modes: cprofile,stacks,memory or all (loop,traces are scrape-only and ignored here; default: SCRAPER_PROFILE env)")
+
+
+def main(args):
+    deadline = resolve_deadline(args.deadline)
 
     print("=" * 70)
     print("PHASE 2: INGEST TO RECOMO API")
@@ -52,15 +54,23 @@ def main():
     print("Stop anytime with Ctrl+C — run again to resume.\n")
 
     if not os.path.exists(SCRAPED_FILE):
-        print(f"No {SCRAPED_FILE} found. Run 'python main_playwright.py' first.")
+        print(f"No {SCRAPED_FILE} found. Run 'python movie_scraper.py scrape' first.")
         return
 
     with open(SCRAPED_FILE, "r", encoding="utf-8") as f:
         all_movies = json.load(f)
 
-    # Pre-filter: skip movies already in DB (one fast local check)
-    existing_urls = fetch_existing_urls(args.api)
-    movies = [m for m in all_movies if m.get("url") not in existing_urls]
+    # Pre-filter: skip movies already in DB (local replica, synced in the background)
+    replica = IngestedUrlReplica(args.api)
+    if replica.synced_at:
+        print(f"Replica: {len(replica)} ingested URLs in {REPLICA_FILE} (synced {replica.synced_at})")
+        print("Syncing changes in the background...\n")
+        replica.sync_in_background()
+    else:
+        print(f"No synced replica yet — fetching ingested URLs from DB ({args.api})...")
+        replica.sync()
+        print()
+    movies = [m for m in all_movies if m.get("url") not in replica]
 
     print(f"Total scraped:  {len(all_movies)}")
     print(f"Already in DB:  {len(all_movies) - len(movies)}")
@@ -80,37 +90,80 @@ def main():
     store = DataStore(api_url=args.api)
     saved = 0
     failed = 0
-
-    for i, movie in enumerate(movies, 1):
-        try:
-            result = store.insert_movie(movie)
-            if result and result.get("status") == "ingested":
-                saved += 1
+    skipped = 0
+
+    # SCRAPER_PROFILE is shared with the scrape step, so scrape-only modes are dropped rather than rejected
+    ignored = sorted(args.profile & set(SCRAPE_ONLY_MODES))
+    if ignored:
+        print(f"Warning: profile mode(s) {', '.join(ignored)} only apply to scrape — ignored for ingest")
+    profiler = Profiler(args.profile - set(SCRAPE_ONLY_MODES), name="ingest")
+    profiler.batch_start()
+    try:
+        for i, movie in enumerate(movies, 1):
+            if deadline and time.time() >= deadline:
+                print(f"  Deadline reached — {total - i + 1} movies left for next run")
+                total = i - 1
+                break
+
+            # The background sync may have learned about it since the pre-filter
+            if movie.get("url") in replica:
+                skipped += 1
             else:
-                failed += 1
-                print(f"  Unexpected skip: '{movie.get('title', '?')}'")
-        except Exception as e:
-            failed += 1
-            print(f"  Error: '{movie.get('title', '?')}': {e}")
-
-        if i % 50 == 0 or i == total:
-            print(f"  Progress: {i}/{total} | Ingested: {saved} | Failed: {failed}")
-
+                try:
+                    result = store.insert_movie(movie)
+                    status = result.get("status") if result else None
+                    if status == "ingested":
+                        saved += 1
+                        replica.add(movie.get("url"))
+                    elif status in ALREADY_IN_DB_STATUSES:
+                        skipped += 1
+                        replica.add(movie.get("url"))
+                    else:
+                        failed += 1
+                        print(f"  Unexpected response for '{movie.get('title', '?')}': status={status!r}")
+                except Exception as e:
+                    failed += 1
+                    print(f"  Error: '{movie.get('title', '?')}': {e}")
+
+            if i % 50 == 0 or i == total:
+                print(f"  Progress: {i}/{total} | Ingested: {saved} | Failed: {failed}")
+                replica.save()
+
+            # Profiling batch boundary, same size as a scrape batch
+            if i % 500 == 0 and i < total:
+                profiler.batch_end(f"ingest-{i}")
+                profiler.batch_start()
+    finally:
+        profiler.close()
+
+    # Don't let a slow background sync run past the deadline; save what it has so far
+    wait_timeout = max(0, deadline - time.time()) if deadline else None
+    if not replica.wait(wait_timeout):
+        print("  Deadline reached — background replica sync still running, saving partial replica")
+    replica.save()
     print(f"\nDone: {saved} ingested, {failed} failed")
+    if skipped:
+        print(f"Skipped {skipped} already in DB (found by the background sync or reported by the backend)")
 
     # Exit with error if everything failed (e.g. backend unreachable)
-    if total > 0 and saved == 0:
+    if total - skipped > 0 and saved == 0:
         print(f"\nERROR: 0 out of {total} movies ingested — backend may be unreachable.", file=sys.stderr)
         sys.exit(1)
 
 
-if __name__ == "__main__":
+def run(args):
     start_time = time.time()
 
     try:
-        main()
+        main(args)
     except KeyboardInterrupt:
         print("\n\nStopped. Run again to resume.")
 
     elapsed = time.time() - start_time
     print(f"\nTime: {elapsed/60:.1f} minutes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest scraped movies to RecoMo API")
+    add_arguments(parser)
+    run(parser.parse_args())
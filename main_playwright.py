@@ -2,16 +2,38 @@
 Phase 1: Scrape all movie data from sitemap and save to scraped_movies.json
 Resumable — skips already-scraped URLs on restart.
 
-Usage: python main_playwright.py
+Usage: python movie_scraper.py scrape
+       python movie_scraper.py scrape --deadline 240
+       python movie_scraper.py scrape --snapshots
+       python movie_scraper.py scrape --profile loop,cprofile,traces
+       python movie_scraper.py re-extract
+       (or python main_playwright.py [--deadline 240] [--snapshots])
+
+With a deadline (--deadline MINUTES or RUN_DEADLINE=<unix timestamp>), the
+time budget is split between new URLs, retries and ingest
+(see TIME_BUDGET_SHARES in config.py). Batches shrink to fit the observed
+throughput and in-flight pages drain before each phase ends, so nothing is
+lost when the run is cut off.
+
+With --snapshots, each rendered page is also kept in a compressed cache
+(SNAPSHOT_DIR). After fixing an extractor, re-extract rebuilds the movies
+from those snapshots in a process pool — no browser or network needed.
 """
 
+import argparse
 import asyncio
+import gzip
 import json
 import os
 import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 
-from sitemap_parser import SitemapParser
-from scraper.playwright_scraper import PlaywrightMovieScraper
+from config import SNAPSHOT_DIR, SNAPSHOT_MAX_MB, TIME_BUDGET_SHARES
+from scraper.extractors import content_type, extract_movie_fields
+from scraper.profiling import Profiler, parse_profile_modes
+from scraper.run_planner import RunPlanner, resolve_deadline
+from storage.snapshot_cache import SnapshotCache
 
 SCRAPED_FILE = "scraped_movies.json"
 URL_CACHE_FILE = "movie_urls_cache.json"
@@ -30,14 +52,16 @@ def save_scraped(movies):
         json.dump(movies, f, ensure_ascii=False, indent=2)
 
 
-def get_all_urls():
-    """Load URLs from cache if available, otherwise fetch from sitemap."""
-    if os.path.exists(URL_CACHE_FILE):
+def get_all_urls(refresh=False):
+    """Load URLs from cache if available (unless refresh), otherwise fetch from sitemap."""
+    if os.path.exists(URL_CACHE_FILE) and not refresh:
         with open(URL_CACHE_FILE, "r", encoding="utf-8") as f:
             urls = json.load(f)
         print(f"Loaded {len(urls)} URLs from cache ({URL_CACHE_FILE})")
         return urls
 
+    from sitemap_parser import SitemapParser
+
     print("Fetching movie URLs from sitemap...")
     parser = SitemapParser(base_url="https://myflixerz.to")
     urls = parser.get_all_movie_urls()
@@ -50,12 +74,80 @@ def get_all_urls():
     return urls
 
 
-async def main():
+async def run_phase(planner, phase, scraper, urls, existing, profiler):
+    """
+    Scrape urls in throughput-sized batches until done or the phase runs out of time.
+    Results are merged into existing (replacing entries with the same URL) and
+    checkpointed after every batch. Returns the URLs that failed — URLs skipped
+    because of the deadline are left for the next run.
+    """
+    planner.start_phase(phase)
+    index = {m["url"]: i for i, m in enumerate(existing)}
+    queue = list(urls)
+    failed = []
+    batch_num = 0
+
+    while queue:
+        size = planner.next_batch_size()
+        if not size:
+            print(f"\nTime budget for '{phase}' used up — {len(queue)} URLs left for next run")
+            break
+
+        batch_num += 1
+        batch_urls, queue = queue[:size], queue[size:]
+        print(f"\n--- {phase} batch {batch_num} ({len(batch_urls)} URLs, {len(queue)} queued) ---")
+
+        batch_start = time.time()
+        profiler.batch_start()
+        results = await scraper.scrape_all(batch_urls, stop_at=planner.cutoff())
+        profiler.batch_end(f"{phase}-{batch_num}")
+        skipped = set(scraper.skipped_urls)
+        planner.record_batch(len(batch_urls) - len(skipped), time.time() - batch_start)
+
+        for movie in results:
+            if movie["url"] in index:
+                existing[index[movie["url"]]] = movie
+            else:
+                index[movie["url"]] = len(existing)
+                existing.append(movie)
+
+        succeeded_urls = {m["url"] for m in results}
+        failed.extend(u for u in batch_urls if u not in succeeded_urls and u not in skipped)
+        queue = [u for u in batch_urls if u in skipped] + queue
+
+        save_scraped(existing)
+        print(f"Checkpoint: {len(existing)} total movies saved to {SCRAPED_FILE}")
+
+    return failed
+
+
+async def main(deadline_minutes=None, snapshots=False, profile_modes=()):
+    profiler = Profiler(profile_modes, name="scrape")
+    profiler.attach_loop()
+    try:
+        await scrape(deadline_minutes, snapshots, profiler)
+    finally:
+        profiler.close()
+
+
+async def scrape(deadline_minutes, snapshots, profiler):
+    # Imported here so discover/ingest/stats don't pay for loading Playwright
+    from scraper.playwright_scraper import PlaywrightMovieScraper
+
+    deadline = resolve_deadline(deadline_minutes)
+
     print("=" * 70)
     print("PHASE 1: SCRAPE MOVIE DATA")
     print("=" * 70)
     print(f"Output: {SCRAPED_FILE}")
     print(f"Batch size: {BATCH_SIZE}")
+    snapshot_cache = None
+    if snapshots:
+        snapshot_cache = SnapshotCache(SNAPSHOT_DIR, max_bytes=SNAPSHOT_MAX_MB * 1024 ** 2)
+        print(f"Snapshots: {SNAPSHOT_DIR} ({len(snapshot_cache)} cached)")
+    if deadline:
+        print(f"Deadline: {datetime.fromtimestamp(deadline):%Y-%m-%d %H:%M:%S} "
+              f"({(deadline - time.time()) / 60:.0f} minutes)")
     print("Stop anytime with Ctrl+C — progress is saved.\n")
 
     all_urls = get_all_urls()
@@ -71,53 +163,118 @@ async def main():
     scraped_urls = {m["url"] for m in existing}
     remaining_urls = [u for u in all_urls if u not in scraped_urls]
 
-    if not remaining_urls:
-        print(f"\nAll {len(all_urls)} movies already scraped!")
-        print(f"Run 'python ingest.py' to send them to the API.")
-        return
-
     print(f"Already scraped: {len(existing)}")
     print(f"Remaining: {len(remaining_urls)}")
 
-    scraper = PlaywrightMovieScraper(max_concurrent=3, headless=True)
+    planner = RunPlanner(deadline, TIME_BUDGET_SHARES, max_batch=BATCH_SIZE)
 
-    for batch_start in range(0, len(remaining_urls), BATCH_SIZE):
-        batch_urls = remaining_urls[batch_start:batch_start + BATCH_SIZE]
-        batch_num = batch_start // BATCH_SIZE + 1
-        total_batches = (len(remaining_urls) + BATCH_SIZE - 1) // BATCH_SIZE
+    scraper = PlaywrightMovieScraper(max_concurrent=3, headless=True, snapshot_cache=snapshot_cache,
+                                     profiler=profiler)
+    failed_urls = await run_phase(planner, "new", scraper, remaining_urls, existing, profiler)
 
-        print(f"\n--- Batch {batch_num}/{total_batches} ({len(batch_urls)} URLs) ---")
+    # Retry failed URLs once with lower concurrency
+    if failed_urls:
+        print(f"\nRetrying {len(failed_urls)} failed URLs (concurrency=3)...")
+        retry_scraper = PlaywrightMovieScraper(max_concurrent=3, headless=True, snapshot_cache=snapshot_cache,
+                                               profiler=profiler)
+        still_failed = await run_phase(planner, "retry", retry_scraper, failed_urls, existing, profiler)
+        if still_failed:
+            print(f"  {len(still_failed)} URLs failed after retry (skipped)")
 
-        results = await scraper.scrape_all(batch_urls)
+    if deadline:
+        planner.start_phase("ingest")
 
-        # Find failed URLs and retry once with lower concurrency
-        succeeded_urls = {m["url"] for m in results}
-        failed_urls = [u for u in batch_urls if u not in succeeded_urls]
-
-        if failed_urls:
-            print(f"\nRetrying {len(failed_urls)} failed URLs (concurrency=3)...")
-            retry_scraper = PlaywrightMovieScraper(max_concurrent=3, headless=True)
-            retry_results = await retry_scraper.scrape_all(failed_urls)
-            results.extend(retry_results)
-            still_failed = len(failed_urls) - len(retry_results)
-            if still_failed:
-                print(f"  {still_failed} URLs failed after retry (skipped)")
-
-        existing.extend(results)
-        save_scraped(existing)
-        print(f"Checkpoint: {len(existing)} total movies saved to {SCRAPED_FILE}")
+    scraped_urls = {m["url"] for m in existing}
+    left = sum(1 for u in all_urls if u not in scraped_urls)
+    if left:
+        print(f"\nScraping stopped: {len(existing)} movies in {SCRAPED_FILE}, {left} left for next run")
+    else:
+        print(f"\nScraping complete: {len(existing)} movies in {SCRAPED_FILE}")
+    print(f"Next step: python movie_scraper.py ingest")
 
-    print(f"\nScraping complete: {len(existing)} movies in {SCRAPED_FILE}")
-    print(f"Next step: python ingest.py")
 
+def _extract_snapshot(item):
+    """Worker: run the field extractors over one cached snapshot; (url, error) if it can't be read."""
+    url, path, scraped_at = item
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            html = f.read()
+        movie = {"url": url, "type": content_type(url), "scraped_at": scraped_at}
+        movie.update(extract_movie_fields(html))
+    except Exception as e:
+        return url, f"{type(e).__name__}: {str(e)[:100]}"
+    return movie
+
+
+def re_extract(workers=None):
+    """
+    Rebuild movies in scraped_movies.json from cached snapshots (no network or browser).
+    Returns (movies updated, movies added).
+    """
+    cache = SnapshotCache(SNAPSHOT_DIR, max_bytes=SNAPSHOT_MAX_MB * 1024 ** 2)
+    if not len(cache):
+        print(f"No snapshots in {SNAPSHOT_DIR}. Run 'python movie_scraper.py scrape --snapshots' first.")
+        return 0, 0
+
+    items = [(url, cache.path_for(url), entry["scraped_at"]) for url, entry in cache.index.items()]
+    print(f"Re-extracting {len(items)} snapshots from {SNAPSHOT_DIR} (workers: {workers or os.cpu_count()})...")
 
-if __name__ == "__main__":
+    existing = load_scraped()
+    index = {m["url"]: i for i, m in enumerate(existing)}
+    changed = added = unreadable = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for movie in pool.map(_extract_snapshot, items, chunksize=64):
+            if isinstance(movie, tuple):
+                unreadable += 1
+                print(f"  Skipped unreadable snapshot for {movie[0]} ({movie[1]})")
+                continue
+            if movie["url"] not in index:
+                index[movie["url"]] = len(existing)
+                existing.append(movie)
+                added += 1
+                continue
+
+            # Keep when it was scraped; only a difference in extracted fields counts as an update
+            old = existing[index[movie["url"]]]
+            movie["scraped_at"] = old.get("scraped_at", movie["scraped_at"])
+            if old != movie:
+                existing[index[movie["url"]]] = movie
+                changed += 1
+
+    save_scraped(existing)
+    print(f"Done: {changed} movies updated, {added} added — {len(existing)} in {SCRAPED_FILE}")
+    if unreadable:
+        print(f"  {unreadable} snapshots were missing or unreadable (skipped)")
+    if changed:
+        # ingest skips URLs already in the database, so backfilled fields aren't re-sent
+        print(f"Note: updated fields are in {SCRAPED_FILE} only — movies already ingested "
+              f"are not re-sent to the API")
+    return changed, added
+
+
+def add_arguments(parser):
+    parser.add_argument("--deadline", type=float, default=None,
+                        help="Time budget in minutes (default: RUN_DEADLINE env timestamp, else unlimited)")
+    parser.add_argument("--snapshots", action="store_true",
+                        help=f"Keep a compressed copy of each rendered page in {SNAPSHOT_DIR}/ for re-extract")
+    parser.add_argument("--profile", type=parse_profile_modes, default=os.environ.get("SCRAPER_PROFILE", ""),
+                        help="Profiling modes: loop,cprofile,stacks,memory,traces or all (default: SCRAPER_PROFILE env)")
+
+
+def run(args):
     start_time = time.time()
 
     try:
-        asyncio.run(main())
+        asyncio.run(main(args.deadline, args.snapshots, args.profile))
     except KeyboardInterrupt:
         print("\n\nStopped. Progress saved — run again to resume.")
 
     elapsed = time.time() - start_time
-    print(f"\nTime: {elapsed/60:.1f} minutes")
\ No newline at end of file
+    print(f"\nTime: {elapsed/60:.1f} minutes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape movie data from the sitemap")
+    add_arguments(parser)
+    run(parser.parse_args())
@@ -0,0 +1,129 @@
+"""
+movie_scraper.py: single CLI entry point for the scrape → ingest pipeline.
+(No packaging / console script — run it as `python movie_scraper.py`.)
+
+Usage: python movie_scraper.py discover [--refresh]
+       python movie_scraper.py scrape [--deadline MINUTES] [--snapshots]
+       python movie_scraper.py re-extract [--workers N]
+       python movie_scraper.py ingest [--api URL] [--limit N] [--deadline MINUTES]
+       python movie_scraper.py export [--output FILE]
+       python movie_scraper.py stats
+
+Each subcommand imports its dependencies only when it runs, so lightweight
+steps (ingest, stats) never load Playwright or pandas.
+"""
+
+import argparse
+import json
+import os
+import time
+
+
+def cmd_discover(args):
+    from main_playwright import get_all_urls
+
+    urls = get_all_urls(refresh=args.refresh)
+    print(f"{len(urls)} movie URLs known")
+
+
+def cmd_scrape(args):
+    import main_playwright
+
+    main_playwright.run(args)
+
+
+def cmd_re_extract(args):
+    from main_playwright import re_extract
+
+    start_time = time.time()
+    re_extract(args.workers)
+    print(f"\nTime: {(time.time() - start_time) / 60:.1f} minutes")
+
+
+def cmd_ingest(args):
+    import ingest
+
+    ingest.run(args)
+
+
+def cmd_export(args):
+    from main_playwright import SCRAPED_FILE, load_scraped
+    from storage.data_store import DataStore
+
+    movies = load_scraped()
+    if not movies:
+        print(f"No movies in {SCRAPED_FILE}. Run 'python movie_scraper.py scrape' first.")
+        return
+
+    DataStore().export_to_excel(movies, args.output)
+    print(f"Exported {len(movies)} movies to {args.output}")
+
+
+def cmd_stats(args):
+    from main_playwright import SCRAPED_FILE, URL_CACHE_FILE, load_scraped
+    from storage.url_replica import REPLICA_FILE
+
+    movies = load_scraped()
+    scraped_urls = {m["url"] for m in movies}
+
+    all_urls = []
+    if os.path.exists(URL_CACHE_FILE):
+        with open(URL_CACHE_FILE, "r", encoding="utf-8") as f:
+            all_urls = json.load(f)
+
+    ingested_urls, synced_at = set(), None
+    if os.path.exists(REPLICA_FILE):
+        with open(REPLICA_FILE, "r", encoding="utf-8") as f:
+            replica = json.load(f)
+        ingested_urls, synced_at = set(replica.get("urls", [])), replica.get("synced_at")
+
+    print(f"Known URLs:       {len(all_urls)} ({URL_CACHE_FILE})")
+    print(f"Scraped movies:   {len(movies)} ({SCRAPED_FILE})")
+    print(f"Left to scrape:   {sum(1 for u in all_urls if u not in scraped_urls)}")
+    print(f"Ingested (local): {len(ingested_urls)} ({REPLICA_FILE}, synced {synced_at or 'never'})")
+    print(f"Left to ingest:   {len(scraped_urls - ingested_urls)}")
+
+
+def build_parser():
+    # Argument definitions live next to the code that uses them; importing
+    # main_playwright/ingest here is cheap since Playwright, pandas and
+    # requests are only imported when a command actually needs them.
+    import ingest
+    import main_playwright
+
+    parser = argparse.ArgumentParser(description="MyFlixer movie scraper")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    discover = subparsers.add_parser("discover", help="Fetch movie URLs from the sitemap")
+    discover.add_argument("--refresh", action="store_true", help=f"Ignore {main_playwright.URL_CACHE_FILE} and re-fetch")
+    discover.set_defaults(func=cmd_discover)
+
+    scrape = subparsers.add_parser("scrape", help="Scrape movie pages into scraped_movies.json")
+    main_playwright.add_arguments(scrape)
+    scrape.set_defaults(func=cmd_scrape)
+
+    re_extract = subparsers.add_parser("re-extract", help="Re-run the field extractors over cached page snapshots")
+    re_extract.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    re_extract.set_defaults(func=cmd_re_extract)
+
+    ingest_cmd = subparsers.add_parser("ingest", help="Send scraped movies to the RecoMo API")
+    ingest.add_arguments(ingest_cmd)
+    ingest_cmd.set_defaults(func=cmd_ingest)
+
+    export = subparsers.add_parser("export", help="Export scraped movies to Excel")
+    export.add_argument("--output", default="scraped_movies.xlsx", help="Output file (default: scraped_movies.xlsx)")
+    export.set_defaults(func=cmd_export)
+
+    stats = subparsers.add_parser("stats", help="Summarize scrape and ingest progress")
+    stats.set_defaults(func=cmd_stats)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
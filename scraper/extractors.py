@@ -0,0 +1,200 @@
+"""
+Field extractors for rendered movie pages.
+
+Works on the page HTML (stdlib html.parser, no browser), so the same code
+runs on live pages and on cached snapshots — fix a selector here and
+`movie_scraper.py re-extract` backfills it from the snapshot cache.
+"""
+
+from html.parser import HTMLParser
+from typing import Dict, Iterator, List, Optional
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+
+class Node:
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag: str, attrs: Dict[str, Optional[str]], parent: Optional["Node"]):
+        self.tag = tag
+        self.attrs = attrs
+        self.children = []
+        self.parent = parent
+
+    @property
+    def classes(self) -> List[str]:
+        return (self.attrs.get("class") or "").split()
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        return self.attrs.get(name)
+
+    def text_content(self) -> str:
+        """Concatenated text of all descendants, like DOM textContent."""
+        parts = []
+        for child in self.children:
+            parts.append(child if isinstance(child, str) else child.text_content())
+        return "".join(parts)
+
+    def descendants(self) -> Iterator["Node"]:
+        for child in self.children:
+            if isinstance(child, Node):
+                yield child
+                yield from child.descendants()
+
+    def query_selector_all(self, selector: str) -> List["Node"]:
+        """Match simple 'tag', '.class' or 'tag.class' selectors, in document order."""
+        tag, _, cls = selector.partition(".")
+        return [
+            node for node in self.descendants()
+            if (not tag or node.tag == tag) and (not cls or cls in node.classes)
+        ]
+
+    def query_selector(self, selector: str) -> Optional["Node"]:
+        matches = self.query_selector_all(selector)
+        return matches[0] if matches else None
+
+
+class _TreeBuilder(HTMLParser):
+    """
+    Builds a tree from serialized DOM (page.content()), which always has
+    explicit end tags, so no implied-end-tag handling is needed.
+    """
+
+    # With scripting on, <noscript> content is raw text in the DOM, not elements
+    CDATA_CONTENT_ELEMENTS = HTMLParser.CDATA_CONTENT_ELEMENTS + ("noscript",)
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document", {}, None)
+        self.current = self.root
+        self._template_depth = 0  # <template> content is inert: not part of the document tree
+
+    def handle_starttag(self, tag, attrs):
+        if self._template_depth:
+            if tag == "template":
+                self._template_depth += 1
+            return
+        node = Node(tag, dict(attrs), self.current)
+        self.current.children.append(node)
+        if tag == "template":
+            self._template_depth = 1
+        elif tag not in VOID_TAGS:
+            self.current = node
+
+    def handle_startendtag(self, tag, attrs):
+        if self._template_depth:
+            return
+        self.current.children.append(Node(tag, dict(attrs), self.current))
+
+    def handle_endtag(self, tag):
+        if self._template_depth:
+            if tag == "template":
+                self._template_depth -= 1
+            return
+        # Close up to the matching open tag; ignore stray end tags
+        node = self.current
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        if node is not self.root:
+            self.current = node.parent
+
+    def handle_data(self, data):
+        if self._template_depth:
+            return
+        self.current.children.append(data)
+
+
+def parse_html(html: str) -> Node:
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+def content_type(url: str) -> str:
+    """Determine type from URL"""
+    return 'TV Series' if '/tv/' in url else 'Movie'
+
+
+def _link_texts(row: Node) -> List[str]:
+    texts = []
+    for link in row.query_selector_all('a'):
+        text = link.text_content()
+        if text:
+            texts.append(text.strip())
+    return texts
+
+
+def extract_movie_fields(html: str) -> Dict:
+    """Extract movie details from a rendered movie page"""
+    doc = parse_html(html)
+    movie_data = {}
+
+    # Title
+    title = doc.query_selector('.heading-name')
+    if title and title.text_content():
+        movie_data['title'] = title.text_content().strip()
+
+    # Poster image
+    poster = doc.query_selector('img.film-poster-img')
+    if poster:
+        # Try src first, then data-src (lazy-loaded images)
+        src = poster.get_attribute('src')
+        if not src or src.startswith('data:'):
+            src = poster.get_attribute('data-src')
+        if src:
+            movie_data['image_url'] = src
+
+    # IMDB Rating
+    rating = doc.query_selector('.btn-imdb')
+    if rating and rating.text_content():
+        movie_data['rating'] = rating.text_content().strip()
+
+    # Description
+    description = doc.query_selector('.description')
+    if description and description.text_content():
+        # Clean up extra whitespace and newlines
+        movie_data['description'] = ' '.join(description.text_content().split())
+
+    # Parse all row-line elements for metadata
+    for row in doc.query_selector_all('.row-line'):
+        row_text = row.text_content()
+        if not row_text:
+            continue
+
+        row_text = row_text.strip()
+
+        # Released date
+        if 'Released:' in row_text:
+            movie_data['released'] = row_text.replace('Released:', '').strip()
+
+        # Duration
+        elif 'Duration:' in row_text:
+            duration = row_text.replace('Duration:', '').strip()
+            movie_data['duration'] = ' '.join(duration.split())
+
+        # Genre (links, falling back to text content)
+        elif 'Genre:' in row_text:
+            genres = _link_texts(row)
+            movie_data['genre'] = ', '.join(genres) if genres else row_text.replace('Genre:', '').strip()
+
+        # Country
+        elif 'Country:' in row_text:
+            countries = _link_texts(row)
+            movie_data['country'] = ', '.join(countries) if countries else row_text.replace('Country:', '').strip()
+
+        # Cast
+        elif 'Casts:' in row_text:
+            cast = row_text.replace('Casts:', '').strip()
+            if cast and cast != 'N/A':
+                movie_data['cast'] = ' '.join(cast.split())
+
+        # Production
+        elif 'Production:' in row_text:
+            productions = _link_texts(row)
+            movie_data['production'] = ', '.join(productions) if productions else row_text.replace('Production:', '').strip()
+
+    return movie_data
@@ -5,20 +5,27 @@ from typing import List, Dict, Optional
 import time
 from datetime import datetime
 
+from scraper.extractors import content_type, extract_movie_fields
+
 
 class PlaywrightMovieScraper:
-    def __init__(self, max_concurrent: int = 10, headless: bool = True):
+    def __init__(self, max_concurrent: int = 10, headless: bool = True, snapshot_cache=None, profiler=None):
         """
         Initialize the scraper
 
         Args:
             max_concurrent: Number of concurrent browser contexts (default: 10)
             headless: Run browser in headless mode (default: True)
+            snapshot_cache: Optional SnapshotCache to store each rendered page in
+            profiler: Optional Profiler to report page timings (and traces) to
         """
         self.max_concurrent = max_concurrent
         self.headless = headless
+        self.snapshot_cache = snapshot_cache
+        self.profiler = profiler
         self.scraped_count = 0
         self.failed_count = 0
+        self.skipped_urls = []
         self.start_time = None
 
     async def scrape_movie_details(self, page: Page, url: str) -> Optional[Dict]:
@@ -30,135 +37,26 @@ class PlaywrightMovieScraper:
             # Wait for main content to load
             await page.wait_for_selector('.heading-name, .description', timeout=10000)
 
-            # Determine type from URL
-            content_type = 'TV Series' if '/tv/' in url else 'Movie'
+            # Wait for the (lazy-loaded) poster so it's in the rendered HTML
+            try:
+                await page.wait_for_selector('img.film-poster-img', timeout=5000)
+            except:
+                pass
 
-            # Extract movie details
             movie_data = {
                 'url': url,
-                'type': content_type,
+                'type': content_type(url),
                 'scraped_at': datetime.now().isoformat()
             }
 
-            # Title
-            try:
-                title = await page.text_content('.heading-name', timeout=3000)
-                if title:
-                    movie_data['title'] = title.strip()
-            except:
-                pass
-
-            # Poster image
-            try:
-                poster = await page.wait_for_selector('img.film-poster-img', timeout=5000)
-                if poster:
-                    # Try src first, then data-src (lazy-loaded images)
-                    src = await poster.get_attribute('src')
-                    if not src or src.startswith('data:'):
-                        src = await poster.get_attribute('data-src')
-                    if src:
-                        movie_data['image_url'] = src
-            except:
-                pass
-
-            # IMDB Rating
-            try:
-                rating = await page.text_content('.btn-imdb', timeout=3000)
-                if rating:
-                    movie_data['rating'] = rating.strip()
-            except:
-                pass
-
-            # Description
-            try:
-                description = await page.text_content('.description', timeout=3000)
-                if description:
-                    # Clean up extra whitespace and newlines
-                    description_clean = ' '.join(description.split())
-                    movie_data['description'] = description_clean
-            except:
-                pass
-
-            # Parse all row-line elements for metadata
-            try:
-                row_lines = await page.query_selector_all('.row-line')
-                for row in row_lines:
-                    row_text = await row.text_content()
-                    if not row_text:
-                        continue
-
-                    row_text = row_text.strip()
-
-                    # Released date
-                    if 'Released:' in row_text:
-                        released = row_text.replace('Released:', '').strip()
-                        movie_data['released'] = released
-
-                    # Duration
-                    elif 'Duration:' in row_text:
-                        duration = row_text.replace('Duration:', '').strip()
-                        # Clean up whitespace and newlines
-                        duration_clean = ' '.join(duration.split())
-                        movie_data['duration'] = duration_clean
-
-                    # Genre
-                    elif 'Genre:' in row_text:
-                        # Get genre links
-                        genre_links = await row.query_selector_all('a')
-                        genres = []
-                        for link in genre_links:
-                            genre_text = await link.text_content()
-                            if genre_text:
-                                genres.append(genre_text.strip())
-                        if genres:
-                            # Convert list to comma-separated string
-                            movie_data['genre'] = ', '.join(genres)
-                        else:
-                            # Fallback to text content
-                            genre = row_text.replace('Genre:', '').strip()
-                            movie_data['genre'] = genre
-
-                    # Country
-                    elif 'Country:' in row_text:
-                        # Get country links
-                        country_links = await row.query_selector_all('a')
-                        countries = []
-                        for link in country_links:
-                            country_text = await link.text_content()
-                            if country_text:
-                                countries.append(country_text.strip())
-                        if countries:
-                            movie_data['country'] = ', '.join(countries)
-                        else:
-                            # Fallback to text content
-                            country = row_text.replace('Country:', '').strip()
-                            movie_data['country'] = country
-
-                    # Cast
-                    elif 'Casts:' in row_text:
-                        cast = row_text.replace('Casts:', '').strip()
-                        if cast and cast != 'N/A':
-                            # Clean up whitespace and newlines
-                            cast_clean = ' '.join(cast.split())
-                            movie_data['cast'] = cast_clean
-
-                    # Production
-                    elif 'Production:' in row_text:
-                        # Get production links
-                        prod_links = await row.query_selector_all('a')
-                        productions = []
-                        for link in prod_links:
-                            prod_text = await link.text_content()
-                            if prod_text:
-                                productions.append(prod_text.strip())
-                        if productions:
-                            movie_data['production'] = ', '.join(productions)
-                        else:
-                            # Fallback to text content
-                            production = row_text.replace('Production:', '').strip()
-                            movie_data['production'] = production
-            except Exception as e:
-                print(f"  Warning: Error parsing row-lines: {str(e)[:50]}")
+            # One round-trip for the whole DOM; fields are extracted from the HTML
+            # so the same extractors can re-run later over cached snapshots.
+            # Parsing and snapshot writes run in a thread to keep the loop (and
+            # every other page's Playwright traffic) responsive.
+            html = await page.content()
+            if self.snapshot_cache is not None:
+                await asyncio.to_thread(self.snapshot_cache.put, url, html)
+            movie_data.update(await asyncio.to_thread(extract_movie_fields, html))
 
             self.scraped_count += 1
 
@@ -175,25 +73,66 @@ class PlaywrightMovieScraper:
             print(f"[Error] Failed to scrape {url}: {str(e)[:100]}")
             return None
 
-    async def scrape_single(self, browser: Browser, url: str, semaphore: asyncio.Semaphore) -> Optional[Dict]:
+    def _past_cutoff(self, url: str, stop_at: Optional[float]) -> bool:
+        if stop_at is not None and time.time() >= stop_at:
+            self.skipped_urls.append(url)
+            return True
+        return False
+
+    async def scrape_single(self, browser: Browser, url: str, semaphore: asyncio.Semaphore,
+                            stop_at: Optional[float] = None) -> Optional[Dict]:
         """Scrape a single movie URL with semaphore control"""
+        # Past the cutoff: don't start new pages, let in-flight ones drain.
+        # Checked before and right after taking a slot too, so skipped URLs
+        # don't each hold a slot through the rate-limit delay.
+        if self._past_cutoff(url, stop_at):
+            return None
+
         async with semaphore:
+            if self._past_cutoff(url, stop_at):
+                return None
+
             # Random delay to avoid triggering rate limits
             await asyncio.sleep(random.uniform(1.5, 4.0))
+
+            if self._past_cutoff(url, stop_at):
+                return None
+
             context = await browser.new_context(
                 viewport={'width': 1280, 'height': 720},
                 user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             )
             page = await context.new_page()
+            page_start = time.time()
 
+            # Profiling is best-effort: its errors must never fail the page or leak the context
             try:
+                if self.profiler is not None:
+                    try:
+                        await self.profiler.start_trace(context)
+                    except Exception as e:
+                        print(f"[Profile] Warning: could not start trace for {url}: {str(e)[:100]}")
+                page_start = time.time()
                 result = await self.scrape_movie_details(page, url)
                 return result
             finally:
-                await context.close()
+                try:
+                    if self.profiler is not None:
+                        await self.profiler.page_done(context, url, time.time() - page_start)
+                except Exception as e:
+                    print(f"[Profile] Warning: could not record {url}: {str(e)[:100]}")
+                finally:
+                    await context.close()
+
+    async def scrape_all(self, movie_urls: List[str], stop_at: Optional[float] = None) -> List[Dict]:
+        """
+        Scrape all movies with parallel processing
 
-    async def scrape_all(self, movie_urls: List[str]) -> List[Dict]:
-        """Scrape all movies with parallel processing"""
+        Args:
+            movie_urls: URLs to scrape
+            stop_at: Unix timestamp after which no new pages are started;
+                     URLs not started are listed in self.skipped_urls
+        """
         print(f"\n{'='*70}")
         print(f"Starting Playwright scraper")
         print(f"Total URLs: {len(movie_urls)}")
@@ -204,6 +143,7 @@ class PlaywrightMovieScraper:
         self.start_time = time.time()
         self.scraped_count = 0
         self.failed_count = 0
+        self.skipped_urls = []
 
         async with async_playwright() as p:
             # Launch browser
@@ -214,7 +154,7 @@ class PlaywrightMovieScraper:
 
             # Create tasks for all URLs
             tasks = [
-                self.scrape_single(browser, url, semaphore)
+                self.scrape_single(browser, url, semaphore, stop_at)
                 for url in movie_urls
             ]
 
@@ -223,6 +163,9 @@ class PlaywrightMovieScraper:
 
             await browser.close()
 
+        if self.snapshot_cache is not None:
+            self.snapshot_cache.save()
+
         # Filter out None and exceptions
         valid_results = [r for r in results if r and isinstance(r, dict)]
 
@@ -232,6 +175,8 @@ class PlaywrightMovieScraper:
         print(f"Total time: {elapsed:.2f} seconds")
         print(f"Successfully scraped: {len(valid_results)}")
         print(f"Failed: {self.failed_count}")
+        if self.skipped_urls:
+            print(f"Skipped (deadline): {len(self.skipped_urls)}")
         print(f"Average rate: {len(valid_results)/elapsed:.2f} movies/sec")
         print(f"{'='*70}\n")
 
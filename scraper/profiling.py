@@ -0,0 +1,287 @@
+"""
+Opt-in profiling for scrape and ingest runs (--profile MODES or SCRAPER_PROFILE).
+
+Modes (comma-separated, or "all"):
+    loop      Event-loop lag monitor (scrape only); with PYTHONASYNCIODEBUG=1 also
+              asyncio's slow-callback log — debug mode slows the loop, so
+              summary.json records whether it was on
+    cprofile  cProfile of every Nth batch (.prof — snakeviz / flameprof)
+    stacks    Sampled stacks of every Nth batch (.folded — flamegraph.pl / speedscope)
+    memory    tracemalloc snapshot + top allocations after every Nth batch
+    traces    Playwright traces of the N slowest pages (scrape only)
+
+Artifacts go to PROFILE_DIR/<name>-<timestamp>/ along with summary.json.
+"""
+
+import argparse
+import cProfile
+import heapq
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+from config import PROFILE_DIR, PROFILE_SAMPLE_EVERY, PROFILE_SLOWEST_PAGES, SLOW_CALLBACK_SECONDS
+
+PROFILE_MODES = ("loop", "cprofile", "stacks", "memory", "traces")
+SCRAPE_ONLY_MODES = ("loop", "traces")  # Need the event loop / browser contexts
+
+
+def parse_profile_modes(value):
+    """argparse type for --profile: comma-separated modes, or "all"."""
+    if not value:
+        return set()
+    if value == "all":
+        return set(PROFILE_MODES)
+    modes = {m.strip() for m in value.split(",") if m.strip()}
+    unknown = modes - set(PROFILE_MODES)
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown profile mode(s): {', '.join(sorted(unknown))} (choose from {', '.join(PROFILE_MODES)}, all)"
+        )
+    return modes
+
+
+class _StackSampler:
+    """Samples one thread's Python stack on a background thread, in folded format."""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, path):
+        self._stop.set()
+        self._thread.join()
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    def __init__(self, modes, name="scrape", directory=PROFILE_DIR, sample_every=PROFILE_SAMPLE_EVERY,
+                 slowest_pages=PROFILE_SLOWEST_PAGES, lag_interval=0.1, slow_callback=SLOW_CALLBACK_SECONDS):
+        """
+        Args:
+            modes: Set of PROFILE_MODES to enable (empty = profiling off)
+            name: Run name, used in the artifact directory
+            directory: Where artifact directories are created
+            sample_every: Profile every Nth batch (first batch always)
+            slowest_pages: How many of the slowest pages to keep traces for
+            lag_interval: How often the loop-lag monitor wakes up (seconds)
+            slow_callback: Callbacks running longer than this are logged (seconds)
+        """
+        self.modes = set(modes)
+        self.sample_every = max(1, sample_every)
+        self.slowest_pages = slowest_pages
+        self.lag_interval = lag_interval
+        self.slow_callback = slow_callback
+        self.directory = os.path.join(directory, f"{name}-{datetime.now():%Y%m%d-%H%M%S}")
+
+        self.batch_num = 0
+        self.batches = []
+        self.lag_samples = []
+        self.slow_callbacks = 0
+        self.asyncio_debug = False
+        self._slowest = []  # Min-heap of (seconds, url, trace path or None)
+        self._batch_start = None
+        self._sampled = False
+        self._cprofile = None
+        self._sampler = None
+        self._lag_task = None
+        self._log_handler = None
+
+        if self.modes:
+            os.makedirs(self.directory, exist_ok=True)
+            print(f"[Profile] Modes: {', '.join(sorted(self.modes))} -> {self.directory}")
+        if "memory" in self.modes:
+            tracemalloc.start(10)
+
+    @property
+    def traces(self):
+        return "traces" in self.modes
+
+    # --- asyncio -------------------------------------------------------------
+
+    def attach_loop(self):
+        """
+        Start loop-lag monitoring (call from inside the loop). Slow callbacks are
+        only logged if the loop already runs in debug mode: turning it on here
+        would skew the throughput being measured.
+        """
+        if "loop" not in self.modes:
+            return
+
+        # Imported here so ingest (no event loop) doesn't pay for asyncio
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        self._lag_task = loop.create_task(self._monitor_lag())
+
+        self.asyncio_debug = loop.get_debug()
+        if not self.asyncio_debug:
+            return
+        loop.slow_callback_duration = self.slow_callback
+
+        profiler = self
+
+        class _SlowCallbackHandler(logging.FileHandler):
+            def emit(self, record):
+                if "took" in record.getMessage():
+                    profiler.slow_callbacks += 1
+                super().emit(record)
+
+        self._log_handler = _SlowCallbackHandler(os.path.join(self.directory, "slow_callbacks.log"), encoding="utf-8")
+        self._log_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        asyncio_logger = logging.getLogger("asyncio")
+        asyncio_logger.addHandler(self._log_handler)
+        asyncio_logger.setLevel(logging.WARNING)
+
+    async def _monitor_lag(self):
+        import asyncio
+
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.lag_interval)
+            self.lag_samples.append(time.perf_counter() - started - self.lag_interval)
+
+    # --- batch boundaries ----------------------------------------------------
+
+    def batch_start(self):
+        self.batch_num += 1
+        self._batch_start = time.time()
+        self._sampled = (self.batch_num - 1) % self.sample_every == 0
+        if not self._sampled:
+            return
+
+        if "cprofile" in self.modes:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        if "stacks" in self.modes:
+            self._sampler = _StackSampler(threading.get_ident())
+            self._sampler.start()
+
+    def batch_end(self, label):
+        if self._batch_start is None:
+            return
+        self.batches.append({"label": label, "seconds": round(time.time() - self._batch_start, 2)})
+        self._batch_start = None
+
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(os.path.join(self.directory, f"cprofile-{label}.prof"))
+            self._cprofile = None
+        if self._sampler is not None:
+            self._sampler.stop(os.path.join(self.directory, f"stacks-{label}.folded"))
+            self._sampler = None
+        if "memory" in self.modes and self._sampled:
+            snapshot = tracemalloc.take_snapshot()
+            snapshot.dump(os.path.join(self.directory, f"tracemalloc-{label}.snapshot"))
+            current, peak = tracemalloc.get_traced_memory()
+            with open(os.path.join(self.directory, f"tracemalloc-{label}.txt"), "w", encoding="utf-8") as f:
+                f.write(f"current={current / 1024 ** 2:.1f} MB peak={peak / 1024 ** 2:.1f} MB\n\n")
+                for stat in snapshot.statistics("lineno")[:25]:
+                    f.write(f"{stat}\n")
+
+    # --- pages ---------------------------------------------------------------
+
+    async def start_trace(self, context):
+        if self.traces:
+            await context.tracing.start(screenshots=True, snapshots=True)
+
+    async def page_done(self, context, url, seconds):
+        """Record a page's time; keep its Playwright trace if it's among the slowest."""
+        is_slow = len(self._slowest) < self.slowest_pages or seconds > self._slowest[0][0]
+        path = None
+
+        if self.traces:
+            if is_slow:
+                slug = url.rstrip("/").rsplit("/", 1)[-1]
+                path = os.path.join(self.directory, "traces", f"{seconds:06.1f}s-{slug}.zip")
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                await context.tracing.stop(path=path)
+            else:
+                await context.tracing.stop()
+
+        if is_slow:
+            heapq.heappush(self._slowest, (seconds, url, path))
+            if len(self._slowest) > self.slowest_pages:
+                _, _, evicted = heapq.heappop(self._slowest)
+                if evicted and os.path.exists(evicted):
+                    os.remove(evicted)
+
+    # --- report --------------------------------------------------------------
+
+    def close(self):
+        """Stop everything and write summary.json."""
+        if not self.modes:
+            return
+
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+        if self._log_handler is not None:
+            logging.getLogger("asyncio").removeHandler(self._log_handler)
+            self._log_handler.close()
+        if self._batch_start is not None:
+            # Record the last (possibly short, unsampled) batch too, e.g. when a deadline cut the run
+            self.batch_end("final")
+        if "memory" in self.modes:
+            tracemalloc.stop()
+
+        summary = {
+            "modes": sorted(self.modes),
+            "batches": self.batches,
+            "slowest_pages": [
+                {"url": url, "seconds": round(seconds, 2), "trace": path}
+                for seconds, url, path in sorted(self._slowest, reverse=True)
+            ],
+        }
+        if self.lag_samples:
+            lags = sorted(self.lag_samples)
+            summary["loop_lag"] = {
+                "samples": len(lags),
+                "p50_ms": round(lags[len(lags) // 2] * 1000, 1),
+                "p99_ms": round(lags[int(len(lags) * 0.99)] * 1000, 1),
+                "max_ms": round(lags[-1] * 1000, 1),
+                # Wake-ups delayed by more than the slow-callback threshold
+                "stalls": sum(1 for lag in lags if lag >= self.slow_callback),
+            }
+        if "loop" in self.modes:
+            summary["asyncio_debug"] = self.asyncio_debug
+            if self.asyncio_debug:
+                summary["slow_callbacks"] = self.slow_callbacks
+
+        with open(os.path.join(self.directory, "summary.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+        print(f"\n[Profile] Artifacts in {self.directory}")
+        if "loop_lag" in summary:
+            lag = summary["loop_lag"]
+            print(f"  Loop lag: p50 {lag['p50_ms']} ms | p99 {lag['p99_ms']} ms | max {lag['max_ms']} ms "
+                  f"| stalls: {lag['stalls']}")
+        if self.asyncio_debug:
+            print(f"  Slow callbacks: {self.slow_callbacks} (asyncio debug mode was on — throughput is skewed)")
+        if summary["slowest_pages"]:
+            slowest = summary["slowest_pages"][0]
+            print(f"  Slowest page: {slowest['seconds']}s {slowest['url']}")
@@ -0,0 +1,111 @@
+"""
+Time-budget planner for deadline-bounded runs (e.g. the 5-hour CI window).
+
+Splits the remaining wall-clock budget between run phases by configurable
+shares, sizes scrape batches from observed throughput, and gives each batch
+a cutoff after which no new pages are started so in-flight work can drain
+and be checkpointed before the phase ends.
+"""
+
+import os
+import time
+from typing import Dict, Optional
+
+PHASES = ("new", "retry", "ingest")
+
+
+def resolve_deadline(minutes: Optional[float] = None) -> Optional[float]:
+    """
+    Return the run deadline as a Unix timestamp, or None for no deadline.
+
+    --deadline MINUTES (relative to now) wins; otherwise the RUN_DEADLINE
+    environment variable (absolute Unix timestamp) is used, so separate
+    workflow steps can share one deadline.
+    """
+    if minutes:
+        return time.time() + minutes * 60
+    env_deadline = os.environ.get("RUN_DEADLINE")
+    if env_deadline:
+        return float(env_deadline)
+    return None
+
+
+class RunPlanner:
+    def __init__(self, deadline: Optional[float], shares: Dict[str, float],
+                 max_batch: int = 500, min_batch: int = 10, probe_batch: int = 50,
+                 drain_seconds: float = 120):
+        """
+        Args:
+            deadline: Unix timestamp the whole run must finish by (None = unlimited)
+            shares: Relative share of the budget per phase (see PHASES)
+            max_batch: Largest batch to hand out
+            min_batch: Batches smaller than this aren't worth a browser launch
+            probe_batch: Batch size used before any throughput is observed
+            drain_seconds: Time reserved at the end of a phase for in-flight pages
+        """
+        self.deadline = deadline
+        self.shares = {phase: shares.get(phase, 0) for phase in PHASES}
+        self.max_batch = max_batch
+        self.min_batch = min_batch
+        self.probe_batch = probe_batch
+        self.drain_seconds = drain_seconds
+        self.rate = None  # Observed URLs/sec, smoothed across batches
+        self.phase = None
+        self.phase_end = None
+
+    def start_phase(self, phase: str):
+        """
+        Begin a phase and fix its end time.
+
+        The phase gets its share of whatever time is left, weighted against the
+        phases still to come — so time unused by earlier phases rolls forward.
+        """
+        self.phase = phase
+        if self.deadline is None:
+            self.phase_end = None
+            return
+
+        upcoming = PHASES[PHASES.index(phase):]
+        total_share = sum(self.shares[p] for p in upcoming)
+        remaining = max(0.0, self.deadline - time.time())
+        fraction = self.shares[phase] / total_share if total_share else 0
+        self.phase_end = time.time() + remaining * fraction
+
+        print(f"\n[Planner] Phase '{phase}': {remaining * fraction / 60:.1f} of "
+              f"{remaining / 60:.1f} minutes remaining")
+
+    def time_left(self) -> float:
+        """Seconds left in the current phase (inf when there is no deadline)."""
+        if self.phase_end is None:
+            return float("inf")
+        return self.phase_end - time.time()
+
+    def cutoff(self) -> Optional[float]:
+        """Unix timestamp after which no new pages should be started."""
+        if self.phase_end is None:
+            return None
+        return self.phase_end - self.drain_seconds
+
+    def record_batch(self, attempted: int, elapsed: float):
+        """Fold a finished batch into the throughput estimate."""
+        if attempted <= 0 or elapsed <= 0:
+            return
+        rate = attempted / elapsed
+        self.rate = rate if self.rate is None else 0.5 * self.rate + 0.5 * rate
+
+    def next_batch_size(self) -> int:
+        """Size of the next batch, or 0 if the phase has no time for another one."""
+        if self.deadline is None:
+            return self.max_batch
+
+        usable = self.time_left() - self.drain_seconds
+        if usable <= 0:
+            return 0
+        if self.rate is None:
+            return min(self.max_batch, self.probe_batch)
+
+        # Aim to finish with some slack; the cutoff catches any overshoot
+        size = int(self.rate * usable * 0.8)
+        if size < self.min_batch:
+            return 0
+        return min(self.max_batch, size)
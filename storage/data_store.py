@@ -1,9 +1,6 @@
 import re
 import time
 
-import requests
-import pandas as pd
-
 
 def parse_rating(raw):
     """Extract numeric rating from strings like 'IMDB: 7.4' or '7.4'."""
@@ -19,6 +16,9 @@ class DataStore:
 
     def insert_movie(self, movie, max_retries=3):
         """Send a single movie to RecoMo API with retry logic."""
+        # Imported here so the CLI (and export) don't pay for requests at startup
+        import requests
+
         payload = {
             "title": movie.get("title", ""),
             "description": movie.get("description"),
@@ -61,5 +61,8 @@ class DataStore:
                     raise
 
     def export_to_excel(self, movies, filename="scraped_movies.xlsx"):
+        # Imported here so ingest doesn't pay pandas' import time for an unused export
+        import pandas as pd
+
         df = pd.DataFrame(movies)
         df.to_excel(filename, index=False)
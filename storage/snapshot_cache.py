@@ -0,0 +1,151 @@
+"""
+Compressed, content-addressed cache of rendered movie pages.
+
+Layout:
+    <dir>/index.json                      url -> {"sha256", "size", "scraped_at"}
+    <dir>/objects/ab/abcdef....html.gz    gzip'd HTML, named by its sha256
+
+Identical pages are stored once. When the cache grows past max_bytes, the
+oldest snapshots are evicted first.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+
+class SnapshotCache:
+    def __init__(self, directory="snapshots", max_bytes=2 * 1024 ** 3):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(directory, "index.json")
+        self.index = {}
+        self._orphans = set()  # Digests replaced by put(), deleted once save() drops them from disk
+        self._lock = threading.Lock()  # put() runs on worker threads during a scrape
+        self._swept = False
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+
+    def __len__(self):
+        return len(self.index)
+
+    def _blob_path(self, digest):
+        return os.path.join(self.directory, "objects", digest[:2], f"{digest}.html.gz")
+
+    def put(self, url, html):
+        """Store the rendered HTML for url (call save() to persist the index). Thread-safe."""
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(gzip.compress(data))
+                os.replace(tmp_path, path)
+
+            previous = self.index.get(url)
+            if previous and previous["sha256"] != digest:
+                self._orphans.add(previous["sha256"])
+
+            self.index[url] = {
+                "sha256": digest,
+                "size": os.path.getsize(path),
+                "scraped_at": datetime.now().isoformat(),
+            }
+
+    def path_for(self, url):
+        """Path of the compressed snapshot for url, or None."""
+        entry = self.index.get(url)
+        return self._blob_path(entry["sha256"]) if entry else None
+
+    def get(self, url):
+        """Rendered HTML for url, or None."""
+        path = self.path_for(url)
+        if not path or not os.path.exists(path):
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return f.read()
+
+    def total_bytes(self):
+        # Blobs shared by several URLs count once
+        sizes = {e["sha256"]: e["size"] for e in self.index.values()}
+        return sum(sizes.values())
+
+    def sweep(self):
+        """
+        Delete blobs (and .tmp files) no index entry references — left behind
+        when a run is killed between writing blobs and saving the index.
+        """
+        referenced = {entry["sha256"] for entry in self.index.values()} | self._orphans
+        removed = 0
+        for root, _, files in os.walk(os.path.join(self.directory, "objects")):
+            for name in files:
+                if name.endswith(".tmp") or name.split(".", 1)[0] not in referenced:
+                    try:
+                        os.remove(os.path.join(root, name))
+                        removed += 1
+                    except FileNotFoundError:
+                        pass
+        return removed
+
+    def evict(self):
+        """Drop the oldest snapshots until the cache fits in max_bytes."""
+        # Every blob this process writes is indexed straight away, so
+        # unreferenced ones can only come from an earlier run: sweep once
+        if not self._swept:
+            self._swept = True
+            swept = self.sweep()
+            if swept:
+                print(f"Snapshot cache: removed {swept} unindexed blobs from an interrupted run")
+
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return 0
+
+        refs = {}
+        for entry in self.index.values():
+            refs[entry["sha256"]] = refs.get(entry["sha256"], 0) + 1
+
+        evicted = 0
+        for url, entry in sorted(self.index.items(), key=lambda item: item[1]["scraped_at"]):
+            if total <= self.max_bytes:
+                break
+            del self.index[url]
+            evicted += 1
+            refs[entry["sha256"]] -= 1
+            if refs[entry["sha256"]] == 0:
+                total -= entry["size"]
+                try:
+                    os.remove(self._blob_path(entry["sha256"]))
+                except FileNotFoundError:
+                    pass
+        return evicted
+
+    def save(self):
+        """Evict if over budget and write the index."""
+        with self._lock:
+            evicted = self.evict()
+            if evicted:
+                print(f"Snapshot cache: evicted {evicted} oldest snapshots to stay under "
+                      f"{self.max_bytes / 1024 ** 2:.0f} MB")
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.index, f)
+            os.replace(tmp_path, self.index_path)
+
+            # Only after the new index is on disk, so the old one never points at a missing blob
+            referenced = {entry["sha256"] for entry in self.index.values()}
+            for digest in self._orphans - referenced:
+                try:
+                    os.remove(self._blob_path(digest))
+                except FileNotFoundError:
+                    pass
+            self._orphans.clear()
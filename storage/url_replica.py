@@ -0,0 +1,196 @@
+"""
+Local replica of the URLs already ingested into the RecoMo API.
+
+Kept in ingested_urls.json (cached between workflow runs under its own
+key, saved after ingest) and synced incrementally, so ingest doesn't have to pull
+the full URL list on every run.
+
+API contract (each part optional — older backends just return a list):
+    GET /api/movies/urls
+        Legacy: JSON list of every URL.
+    GET /api/movies/urls?since=<iso>&cursor=<c>&limit=<n>
+        {"urls": [...], "next_cursor": "..." | null, "server_time": "<iso>"}
+        URLs added since `since`, one page at a time.
+    GET /api/movies/urls/digest?buckets=<n>
+        {"digests": ["<sha256 hex>", ...]}  one digest per hash bucket
+    GET /api/movies/urls?bucket=<i>&buckets=<n>
+        Same shape as above, restricted to one hash bucket.
+
+A URL's bucket is int(sha1(url)[:8], 16) % n; a bucket's digest is the
+sha256 of its URLs, sorted and joined with newlines. Buckets whose digests
+differ are re-fetched, which catches deletions and missed deltas.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+REPLICA_FILE = "ingested_urls.json"
+DIGEST_BUCKETS = 64
+
+
+def url_bucket(url, buckets=DIGEST_BUCKETS):
+    """Hash bucket a URL belongs to."""
+    return int(hashlib.sha1(url.encode("utf-8")).hexdigest()[:8], 16) % buckets
+
+
+def bucket_digests(urls, buckets=DIGEST_BUCKETS):
+    """Digest of each hash bucket of urls."""
+    groups = [[] for _ in range(buckets)]
+    for url in urls:
+        groups[url_bucket(url, buckets)].append(url)
+    return [hashlib.sha256("\n".join(sorted(g)).encode("utf-8")).hexdigest() for g in groups]
+
+
+class IngestedUrlReplica:
+    def __init__(self, api_url, path=REPLICA_FILE, timeout=(10, 30), page_size=5000):
+        self.api_url = api_url
+        self.path = path
+        self.timeout = timeout
+        self.page_size = page_size
+        self.urls = set()
+        self.synced_at = None
+        self._added = set()  # URLs recorded locally while a sync is running
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # The background sync saves too
+        self._thread = None
+        self.load()
+
+    def __contains__(self, url):
+        with self._lock:
+            return url in self.urls
+
+    def __len__(self):
+        with self._lock:
+            return len(self.urls)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.urls = set(data.get("urls", []))
+            self.synced_at = data.get("synced_at")
+        except (OSError, ValueError) as e:
+            print(f"  Warning: could not read {self.path} ({e}). Starting with an empty replica.")
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with self._save_lock:
+            with self._lock:
+                data = {"synced_at": self.synced_at, "urls": sorted(self.urls)}
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+    def add(self, url):
+        """Record a URL that was just ingested."""
+        with self._lock:
+            self.urls.add(url)
+            self._added.add(url)
+
+    def _fetch_pages(self, path, params):
+        """
+        GET a URL listing, following cursors. Returns (urls, server_time, is_delta) —
+        is_delta is False when the backend answered with a plain (full) list.
+        """
+        # Imported here so the CLI and stats don't pay for requests at startup
+        import requests
+
+        urls = []
+        params = dict(params, limit=self.page_size)
+        while True:
+            resp = requests.get(f"{self.api_url}{path}", params=params, timeout=self.timeout)
+            resp.raise_for_status()
+            data = resp.json()
+            if isinstance(data, list):
+                return data, None, False
+
+            urls.extend(data.get("urls", []))
+            if not data.get("next_cursor"):
+                return urls, data.get("server_time"), True
+            params["cursor"] = data["next_cursor"]
+
+    def _pull_changes(self):
+        """Fetch URLs added since the last sync. Returns the new sync timestamp."""
+        requested_at = datetime.now(timezone.utc).isoformat()
+        params = {"since": self.synced_at} if self.synced_at else {}
+        urls, server_time, is_delta = self._fetch_pages("/api/movies/urls", params)
+
+        with self._lock:
+            if is_delta:
+                self.urls.update(urls)
+            else:
+                self.urls = set(urls) | self._added
+        scope = "since last sync" if is_delta and self.synced_at else "(full list)"
+        print(f"  Replica sync: {len(urls)} URLs {scope}")
+        return server_time or requested_at
+
+    def _reconcile(self):
+        """Re-fetch hash buckets whose digests differ from the server's."""
+        import requests
+
+        resp = requests.get(
+            f"{self.api_url}/api/movies/urls/digest",
+            params={"buckets": DIGEST_BUCKETS},
+            timeout=self.timeout,
+        )
+        if resp.status_code == 404:
+            return  # Backend doesn't support digests
+        resp.raise_for_status()
+        remote = resp.json().get("digests", [])
+
+        with self._lock:
+            local = bucket_digests(self.urls)
+        mismatched = [i for i, (a, b) in enumerate(zip(local, remote)) if a != b]
+        if not mismatched:
+            return
+
+        print(f"  Replica reconcile: {len(mismatched)}/{DIGEST_BUCKETS} buckets differ, re-fetching")
+        for bucket in mismatched:
+            params = {"bucket": bucket, "buckets": DIGEST_BUCKETS}
+            urls, _, _ = self._fetch_pages("/api/movies/urls", params)
+            # Filter in case the backend ignored the bucket params
+            bucket_urls = {u for u in urls if url_bucket(u) == bucket}
+            with self._lock:
+                added = {u for u in self._added if url_bucket(u) == bucket}
+                self.urls = {u for u in self.urls if url_bucket(u) != bucket} | bucket_urls | added
+
+    def sync(self):
+        """
+        Bring the replica up to date. Never raises — on failure the local copy
+        is kept as is, so a flaky endpoint doesn't cause a full re-ingest.
+        """
+        with self._lock:
+            self._added = set()
+        try:
+            synced_at = self._pull_changes()
+        except Exception as e:
+            print(f"  Warning: replica sync failed ({e}). Using local copy ({len(self)} URLs).")
+            return False
+
+        # The pull succeeded, so commit it even if reconciliation fails — the
+        # next run then asks for deltas instead of the full list again
+        self.synced_at = synced_at
+        try:
+            self._reconcile()
+        except Exception as e:
+            print(f"  Warning: replica reconcile failed ({e}). Keeping synced changes.")
+
+        self.save()
+        return True
+
+    def sync_in_background(self):
+        """Start sync() on a background thread."""
+        self._thread = threading.Thread(target=self.sync, daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout=None):
+        """Wait for a background sync to finish. Returns False if it's still running."""
+        if self._thread:
+            self._thread.join(timeout)
+            return not self._thread.is_alive()
+        return True
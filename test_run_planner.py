@@ -0,0 +1,69 @@
+"""
+Test the deadline run planner (pure logic, no browser or network needed)
+"""
+
+import os
+import time
+
+from scraper.run_planner import RunPlanner, resolve_deadline
+
+SHARES = {"new": 0.5, "retry": 0.25, "ingest": 0.25}
+
+
+def test_start_phase_rolls_unused_time_forward():
+    planner = RunPlanner(time.time() + 1000, SHARES)
+
+    planner.start_phase("new")
+    assert 495 < planner.time_left() <= 500
+
+    # "new" finished straight away: retry splits the full remainder with ingest
+    planner.start_phase("retry")
+    assert 495 < planner.time_left() <= 500
+
+    planner.start_phase("ingest")
+    assert 995 < planner.time_left() <= 1000
+
+
+def test_next_batch_size():
+    planner = RunPlanner(time.time() + 1000, SHARES, max_batch=500, min_batch=10,
+                         probe_batch=50, drain_seconds=120)
+    planner.start_phase("new")
+    assert planner.next_batch_size() == 50  # No throughput observed yet
+
+    planner.record_batch(100, 10)  # 10 URLs/sec
+    assert planner.next_batch_size() == 500  # Capped at max_batch
+
+    # Inside the drain window: no new batch
+    planner.phase_end = time.time() + 100
+    assert planner.next_batch_size() == 0
+
+    # Just outside it, but too slow to fill min_batch
+    planner.rate = 0.1
+    planner.phase_end = time.time() + 120 + 60
+    assert planner.next_batch_size() == 0
+
+    assert RunPlanner(None, SHARES, max_batch=500).next_batch_size() == 500
+
+
+def test_resolve_deadline():
+    saved = os.environ.pop("RUN_DEADLINE", None)
+    try:
+        assert resolve_deadline(None) is None
+
+        os.environ["RUN_DEADLINE"] = "2000000000"
+        assert resolve_deadline(None) == 2000000000.0
+
+        # --deadline wins over the environment
+        deadline = resolve_deadline(30)
+        assert abs(deadline - (time.time() + 1800)) < 5
+    finally:
+        os.environ.pop("RUN_DEADLINE", None)
+        if saved is not None:
+            os.environ["RUN_DEADLINE"] = saved
+
+
+if __name__ == "__main__":
+    test_start_phase_rolls_unused_time_forward()
+    test_next_batch_size()
+    test_resolve_deadline()
+    print("\n[SUCCESS] Run planner works")
@@ -0,0 +1,216 @@
+"""
+Test the HTML field extractors, the snapshot cache and offline re-extraction
+(no browser or network needed)
+"""
+
+import json
+import os
+import tempfile
+
+import main_playwright
+from scraper.extractors import extract_movie_fields, parse_html
+from storage.snapshot_cache import SnapshotCache
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+SAMPLE_PAGE = """
+<html><body>
+  <h2 class="heading-name"><a href="/movie/the-way-to-you-144003">The Way to You</a></h2>
+  <img class="film-poster-img" src="data:image/gif;base64,R0lGOD" data-src="https://img.example/poster.jpg">
+  <button class="btn btn-sm btn-imdb">IMDB: 6.8</button>
+  <div class="description">
+    A young woman   sets out
+    on a journey.
+  </div>
+  <div class="row-line"><span class="type"><strong>Released: </strong></span> 2025-02-14</div>
+  <div class="row-line"><strong>Genre: </strong><a href="/genre/drama">Drama</a>, <a href="/genre/romance">Romance</a></div>
+  <div class="row-line"><strong>Casts: </strong> Jane Doe,
+      John Roe</div>
+  <div class="row-line"><strong>Duration: </strong> 104
+      min</div>
+  <div class="row-line"><strong>Country: </strong><a href="/country/us">United States</a></div>
+  <div class="row-line"><strong>Production: </strong>N/A</div>
+</body></html>
+"""
+
+
+def test_extract_movie_fields():
+    fields = extract_movie_fields(SAMPLE_PAGE)
+    assert fields == {
+        "title": "The Way to You",
+        "image_url": "https://img.example/poster.jpg",
+        "rating": "IMDB: 6.8",
+        "description": "A young woman sets out on a journey.",
+        "released": "2025-02-14",
+        "genre": "Drama, Romance",
+        "cast": "Jane Doe, John Roe",
+        "duration": "104 min",
+        "country": "United States",
+        "production": "N/A",
+    }
+
+
+def test_extract_movie_fields_from_page_fixture():
+    """
+    Full detail page as page.content() serializes it (head, scripts, sidebar
+    nav, a <template>, a <noscript> poster fallback, related-movie posters,
+    footer). Not a live capture yet — replace it with a real
+    `await page.content()` dump of this URL when the markup changes.
+    """
+    with open(os.path.join(FIXTURES_DIR, "movie_page.html"), "r", encoding="utf-8") as f:
+        fields = extract_movie_fields(f.read())
+    assert fields == {
+        "title": "The Way to You",
+        "image_url": "https://img.b112j.xyz/resize/180x270/3c/8d/3c8d8e3e5b2f7a1c9d0e4f5a6b7c8d9e/"
+                     "3c8d8e3e5b2f7a1c9d0e4f5a6b7c8d9e.jpg",
+        "rating": "IMDB: 6.8",
+        "description": "A young woman leaves her small coastal town to find the father she never met, "
+                       "and finds something else along the way.",
+        "released": "2025-02-14",
+        "genre": "Drama, Romance",
+        "cast": "Jane Doe, John Roe",
+        "duration": "104 min",
+        "country": "United States of America",
+        "production": "North Road Films, Harbor Light",
+    }
+
+
+def test_noscript_and_template_are_opaque():
+    # Like the browser with scripting on: neither is part of the queried document
+    fields = extract_movie_fields(
+        '<noscript><img class="film-poster-img" src="a.jpg"></noscript>'
+        '<img class="film-poster-img" src="b.jpg">'
+    )
+    assert fields == {"image_url": "b.jpg"}
+
+    doc = parse_html(
+        '<template><h2 class="heading-name">x</h2><template><p>y</p></template><p>z</p></template>'
+        '<h2 class="heading-name">real</h2>'
+    )
+    assert [n.tag for n in doc.descendants()] == ["template", "h2"]
+    assert doc.query_selector(".heading-name").text_content() == "real"
+
+
+def test_snapshot_cache_dedupes_and_evicts():
+    directory = tempfile.mkdtemp()
+    cache = SnapshotCache(directory, max_bytes=10 ** 9)
+    cache.put("https://myflixerz.to/movie/a-1", SAMPLE_PAGE)
+    cache.put("https://myflixerz.to/movie/b-2", SAMPLE_PAGE)
+    cache.put("https://myflixerz.to/movie/c-3", SAMPLE_PAGE + "<!-- other -->")
+    cache.save()
+
+    cache = SnapshotCache(directory, max_bytes=10 ** 9)
+    assert cache.get("https://myflixerz.to/movie/b-2") == SAMPLE_PAGE
+    assert cache.path_for("https://myflixerz.to/movie/a-1") == cache.path_for("https://myflixerz.to/movie/b-2")
+
+    # Only room for one blob: the two oldest URLs (sharing a blob) go
+    shared_blob = cache.path_for("https://myflixerz.to/movie/a-1")
+    cache.max_bytes = cache.index["https://myflixerz.to/movie/c-3"]["size"]
+    cache.save()
+    assert list(cache.index) == ["https://myflixerz.to/movie/c-3"]
+    assert not os.path.exists(shared_blob)
+
+
+def test_snapshot_cache_replaces_blob_on_reput():
+    directory = tempfile.mkdtemp()
+    cache = SnapshotCache(directory, max_bytes=10 ** 9)
+    cache.put("https://myflixerz.to/movie/a-1", SAMPLE_PAGE)
+    cache.put("https://myflixerz.to/movie/b-2", SAMPLE_PAGE)
+    cache.save()
+    old_blob = cache.path_for("https://myflixerz.to/movie/a-1")
+
+    # Still referenced by b-2, so re-putting a-1 keeps it
+    cache.put("https://myflixerz.to/movie/a-1", SAMPLE_PAGE + "<!-- v2 -->")
+    cache.save()
+    assert os.path.exists(old_blob)
+
+    # Last reference gone: the blob is deleted with the index save
+    cache.put("https://myflixerz.to/movie/b-2", SAMPLE_PAGE + "<!-- v2 -->")
+    assert os.path.exists(old_blob)
+    cache.save()
+    assert not os.path.exists(old_blob)
+
+    blobs = [name for _, _, files in os.walk(os.path.join(directory, "objects")) for name in files]
+    assert len(blobs) == 1
+    assert cache.get("https://myflixerz.to/movie/a-1") == SAMPLE_PAGE + "<!-- v2 -->"
+
+
+def test_snapshot_cache_sweeps_unindexed_blobs():
+    directory = tempfile.mkdtemp()
+    cache = SnapshotCache(directory, max_bytes=10 ** 9)
+    cache.put("https://myflixerz.to/movie/a-1", SAMPLE_PAGE)
+    cache.save()
+    kept = cache.path_for("https://myflixerz.to/movie/a-1")
+
+    # Killed mid-batch: blob written, index never saved
+    SnapshotCache(directory, max_bytes=10 ** 9).put("https://myflixerz.to/movie/b-2", SAMPLE_PAGE + "<!-- b -->")
+
+    cache = SnapshotCache(directory, max_bytes=10 ** 9)
+    cache.save()
+    blobs = [os.path.join(root, name) for root, _, files in os.walk(os.path.join(directory, "objects")) for name in files]
+    assert blobs == [kept]
+
+
+def test_re_extract_updates_scraped_movies():
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+    try:
+        url = "https://myflixerz.to/movie/the-way-to-you-144003"
+        scraped_at = "2025-01-01T00:00:00"
+        main_playwright.save_scraped([{"url": url, "type": "Movie", "title": "Stale title", "scraped_at": scraped_at}])
+        cache = SnapshotCache(main_playwright.SNAPSHOT_DIR)
+        cache.put(url, SAMPLE_PAGE)
+        cache.put("https://myflixerz.to/tv/some-show-1", SAMPLE_PAGE)
+        cache.save()
+
+        assert main_playwright.re_extract(workers=2) == (1, 1)
+
+        with open(main_playwright.SCRAPED_FILE, "r", encoding="utf-8") as f:
+            movies = {m["url"]: m for m in json.load(f)}
+        assert movies[url]["title"] == "The Way to You"
+        assert movies[url]["scraped_at"] == scraped_at
+        assert movies["https://myflixerz.to/tv/some-show-1"]["type"] == "TV Series"
+
+        # Nothing new to extract: no movie counts as updated
+        assert main_playwright.re_extract(workers=2) == (0, 0)
+    finally:
+        os.chdir(cwd)
+
+
+def test_re_extract_skips_missing_snapshots():
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+    try:
+        cache = SnapshotCache(main_playwright.SNAPSHOT_DIR)
+        cache.put("https://myflixerz.to/movie/a-1", SAMPLE_PAGE)
+        cache.put("https://myflixerz.to/movie/b-2", SAMPLE_PAGE + "<!-- other -->")
+        cache.save()
+        os.remove(cache.path_for("https://myflixerz.to/movie/a-1"))
+
+        assert main_playwright.re_extract(workers=2) == (0, 1)
+        with open(main_playwright.SCRAPED_FILE, "r", encoding="utf-8") as f:
+            assert [m["url"] for m in json.load(f)] == ["https://myflixerz.to/movie/b-2"]
+    finally:
+        os.chdir(cwd)
+
+
+def test_re_extract_empty_cache():
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+    try:
+        assert main_playwright.re_extract(workers=2) == (0, 0)
+    finally:
+        os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    test_extract_movie_fields()
+    test_extract_movie_fields_from_page_fixture()
+    test_noscript_and_template_are_opaque()
+    test_snapshot_cache_dedupes_and_evicts()
+    test_snapshot_cache_replaces_blob_on_reput()
+    test_snapshot_cache_sweeps_unindexed_blobs()
+    test_re_extract_updates_scraped_movies()
+    test_re_extract_skips_missing_snapshots()
+    test_re_extract_empty_cache()
+    print("\n[SUCCESS] Extractors, snapshot cache and re-extract work")
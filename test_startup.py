@@ -0,0 +1,89 @@
+"""
+Import-time benchmark for the CLI entry points: lightweight steps must not
+load Playwright or pandas, and must start quickly.
+"""
+
+import subprocess
+import sys
+
+HEAVY_MODULES = {"playwright", "pandas"}
+
+# Cumulative import time budgets (seconds), generous enough for a CI runner
+IMPORT_BUDGETS = {
+    "ingest": 0.5,
+    "main_playwright": 0.5,
+    "storage.data_store": 0.5,
+}
+
+# What `python movie_scraper.py <command>` pays before running the command:
+# importing the CLI and building the parser, which imports every subcommand's
+# module (~70 ms locally, asyncio included)
+CLI_STARTUP_BUDGET = 0.25
+
+CLI_STARTUP_CODE = """
+import time
+start = time.perf_counter()
+import movie_scraper
+movie_scraper.build_parser()
+print(time.perf_counter() - start)
+"""
+
+
+def measure_import(module):
+    """Import module in a fresh interpreter; return (seconds, top-level modules loaded)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    loaded = set()
+    elapsed = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # Header line
+        loaded.add(name.strip().split(".")[0])
+        if name.strip() == module:
+            elapsed = int(cumulative) / 1_000_000
+    return elapsed, loaded
+
+
+def test_entry_points_skip_heavy_imports():
+    for module in IMPORT_BUDGETS:
+        _, loaded = measure_import(module)
+        assert not loaded & HEAVY_MODULES, f"{module} imports {loaded & HEAVY_MODULES}"
+
+
+def measure_cli_startup():
+    """Seconds to import movie_scraper and build its parser, in a fresh interpreter."""
+    result = subprocess.run([sys.executable, "-c", CLI_STARTUP_CODE], capture_output=True, text=True, check=True)
+    return float(result.stdout)
+
+
+def test_cli_parser_skips_requests():
+    """Building the CLI parser (every subcommand) must not import requests either."""
+    watched = sorted(HEAVY_MODULES | {"requests"})
+    code = f"import sys, movie_scraper; movie_scraper.build_parser(); print([m for m in {watched!r} if m in sys.modules])"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]", result.stdout
+
+
+def test_import_time_budget():
+    for module, budget in IMPORT_BUDGETS.items():
+        elapsed, _ = measure_import(module)
+        assert elapsed < budget, f"{module} took {elapsed:.3f}s to import (budget {budget}s)"
+
+
+def test_cli_startup_budget():
+    elapsed = min(measure_cli_startup() for _ in range(3))  # Best of 3 smooths out a cold disk cache
+    assert elapsed < CLI_STARTUP_BUDGET, f"CLI startup took {elapsed:.3f}s (budget {CLI_STARTUP_BUDGET}s)"
+
+
+if __name__ == "__main__":
+    for module, budget in IMPORT_BUDGETS.items():
+        elapsed, loaded = measure_import(module)
+        heavy = ", ".join(sorted(loaded & HEAVY_MODULES)) or "none"
+        print(f"{module:20} {elapsed * 1000:7.1f} ms (budget {budget * 1000:.0f} ms) | heavy: {heavy}")
+    elapsed = measure_cli_startup()
+    print(f"{'CLI build_parser()':20} {elapsed * 1000:7.1f} ms (budget {CLI_STARTUP_BUDGET * 1000:.0f} ms)")
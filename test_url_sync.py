@@ -0,0 +1,191 @@
+"""
+Test the ingested-URL replica sync against a local stub API (no backend needed)
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import ingest
+from storage.url_replica import IngestedUrlReplica, bucket_digests, url_bucket
+
+
+class StubApi(BaseHTTPRequestHandler):
+    """Serves /api/movies/urls with since/cursor/bucket support and digests, and the ingest endpoint."""
+
+    urls = {}  # url -> ISO timestamp it was "ingested"
+    legacy = False
+    digest_status = 200
+    delay = 0
+    requests_seen = []
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        StubApi.requests_seen.append((parsed.path, params))
+        time.sleep(self.delay)
+
+        if parsed.path == "/api/movies/urls/digest":
+            if self.legacy:
+                return self._send(404, {"detail": "Not Found"})
+            if self.digest_status != 200:
+                return self._send(self.digest_status, {"detail": "Error"})
+            buckets = int(params["buckets"])
+            return self._send(200, {"digests": bucket_digests(self.urls, buckets)})
+
+        if parsed.path != "/api/movies/urls":
+            return self._send(404, {"detail": "Not Found"})
+
+        if self.legacy:
+            return self._send(200, sorted(self.urls))
+
+        matching = sorted(
+            u for u, ts in self.urls.items()
+            if ts > params.get("since", "")
+            and ("bucket" not in params or url_bucket(u, int(params["buckets"])) == int(params["bucket"]))
+        )
+        start = int(params.get("cursor", 0))
+        limit = int(params.get("limit", 5000))
+        page = matching[start:start + limit]
+        next_cursor = str(start + limit) if start + limit < len(matching) else None
+        self._send(200, {"urls": page, "next_cursor": next_cursor, "server_time": max(self.urls.values(), default="")})
+
+    def do_POST(self):
+        if self.path != "/api/movies/ingest":
+            return self._send(404, {"detail": "Not Found"})
+        movie = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if movie["url"] in self.urls:
+            return self._send(200, {"status": "skipped"})
+        StubApi.urls[movie["url"]] = "2026-01-02T00:00:00"
+        self._send(200, {"status": "ingested"})
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub(urls, legacy=False, digest_status=200, delay=0):
+    StubApi.urls = dict(urls)
+    StubApi.legacy = legacy
+    StubApi.digest_status = digest_status
+    StubApi.delay = delay
+    StubApi.requests_seen = []
+    server = HTTPServer(("127.0.0.1", 0), StubApi)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def test_incremental_sync():
+    """First sync pulls everything in pages; later syncs only ask for deltas"""
+    urls = {f"https://myflixerz.to/movie/m-{i}": f"2026-01-01T00:00:{i % 60:02d}" for i in range(120)}
+    server, api = start_stub(urls)
+    path = os.path.join(tempfile.mkdtemp(), "ingested_urls.json")
+    try:
+        replica = IngestedUrlReplica(api, path=path, page_size=50)
+        assert replica.sync()
+        assert len(replica) == 120
+
+        StubApi.urls["https://myflixerz.to/movie/new-one"] = "2026-02-01T00:00:00"
+        StubApi.requests_seen = []
+        replica = IngestedUrlReplica(api, path=path, page_size=50)  # reload from disk
+        assert replica.sync()
+        assert "https://myflixerz.to/movie/new-one" in replica
+        assert StubApi.requests_seen[0][1].get("since") == "2026-01-01T00:00:59"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_digest_reconcile_catches_deletions():
+    """A URL deleted server-side disappears via the mismatched bucket"""
+    urls = {f"https://myflixerz.to/movie/m-{i}": "2026-01-01T00:00:00" for i in range(40)}
+    server, api = start_stub(urls)
+    path = os.path.join(tempfile.mkdtemp(), "ingested_urls.json")
+    try:
+        replica = IngestedUrlReplica(api, path=path)
+        assert replica.sync()
+
+        del StubApi.urls["https://myflixerz.to/movie/m-7"]
+        assert replica.sync()
+        assert "https://myflixerz.to/movie/m-7" not in replica
+        assert len(replica) == 39
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_legacy_list_and_flaky_endpoint():
+    """A plain-list backend still works, and a failed sync keeps the local copy"""
+    urls = {f"https://myflixerz.to/movie/m-{i}": "" for i in range(10)}
+    server, api = start_stub(urls, legacy=True)
+    path = os.path.join(tempfile.mkdtemp(), "ingested_urls.json")
+    try:
+        replica = IngestedUrlReplica(api, path=path)
+        assert replica.sync()
+        assert len(replica) == 10
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    replica = IngestedUrlReplica(api, path=path, timeout=(1, 1))
+    assert not replica.sync()
+    assert len(replica) == 10
+
+
+def test_failed_reconcile_still_commits_pull():
+    """A broken digest endpoint doesn't throw away a successful delta pull"""
+    urls = {f"https://myflixerz.to/movie/m-{i}": "2026-01-01T00:00:00" for i in range(10)}
+    server, api = start_stub(urls, digest_status=500)
+    path = os.path.join(tempfile.mkdtemp(), "ingested_urls.json")
+    try:
+        replica = IngestedUrlReplica(api, path=path)
+        assert replica.sync()
+        assert len(replica) == 10
+
+        replica = IngestedUrlReplica(api, path=path)  # reload from disk
+        assert replica.synced_at == "2026-01-01T00:00:00"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_ingest_counts_backend_duplicates_as_skipped():
+    """A URL the stale replica misses is POSTed; the backend's "skipped" isn't a failure"""
+    url = "https://myflixerz.to/movie/known-1"
+    server, api = start_stub({url: "2026-01-01T00:00:00"}, delay=0.5)  # Sync lags behind the loop
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+    try:
+        with open(ingest.SCRAPED_FILE, "w", encoding="utf-8") as f:
+            json.dump([{"url": url, "title": "Known"}], f)
+        with open(ingest.REPLICA_FILE, "w", encoding="utf-8") as f:
+            json.dump({"synced_at": "2025-12-01T00:00:00", "urls": []}, f)  # Stale replica
+
+        # Nothing newly ingested, but nothing failed either: no "backend unreachable" exit
+        ingest.main(argparse.Namespace(api=api, limit=None, deadline=None, profile=set()))
+
+        assert url in IngestedUrlReplica(api)
+    finally:
+        os.chdir(cwd)
+        server.shutdown()
+        server.server_close()
+
+if __name__ == "__main__":
+    test_incremental_sync()
+    test_digest_reconcile_catches_deletions()
+    test_legacy_list_and_flaky_endpoint()
+    test_failed_reconcile_still_commits_pull()
+    test_ingest_counts_backend_duplicates_as_skipped()
+    print("\n[SUCCESS] Replica sync works against the stub API")